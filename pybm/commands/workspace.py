@@ -1,9 +1,11 @@
 import argparse
+import copy
+import os
 import sys
-from typing import Callable, List, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Tuple
 
 from pybm.command import CLICommand
-from pybm.config import PybmConfig
 from pybm.exceptions import PybmError
 from pybm.git import GitWorktreeWrapper
 from pybm.logging import get_logger
@@ -15,111 +17,143 @@ from pybm.util.formatting import (
     make_line,
     make_separator,
 )
+from pybm.util.venv import get_venv_root
 from pybm.venv import PythonVenv
 from pybm.workspace import Workspace
 
 logger = get_logger(__name__)
 
 EnvSubcommand = Callable[[argparse.Namespace], int]
-
-
-class WorkspaceCommand(WorkspaceManagerContextMixin, CLICommand):
-    """
-    Inspect, list, and manage pybm benchmark workspaces.
-    """
-
-    usage = (
-        "pybm workspace install <name> <packages> [<options>]\n"
-        "   or: pybm workspace link <name> <path>\n"
-        "   or: pybm workspace list\n"
-        "   or: pybm workspace sync [<options>]\n"
-        "   or: pybm workspace uninstall <name> <packages> [<options>]\n"
-    )
-
-    def __init__(self):
-        config = PybmConfig.load()
-        super().__init__(name="workspace")
-
-        # relevant config attributes
-        self.datefmt = config.get_value("core.datefmt")
-
-    def add_arguments(self, subcommand: str = None):
-        assert subcommand is not None, "no valid subcommand specified"
-
-        if subcommand == "install":
-            self.parser.add_argument(
-                "name",
+# positional names or option flags, and keyword arguments to `add_argument`
+ArgumentSpec = Tuple[Tuple[str, ...], Dict[str, Any]]
+
+_SUBCOMMAND_ARGS: Dict[str, List[ArgumentSpec]] = {
+    "install": [
+        (
+            ("name",),
+            dict(
                 metavar="<name>",
                 help="Information that uniquely identifies the workspace. Can be "
-                "name, checked out (partial) commit/branch/tag, or worktree directory.",
-            )
-            self.parser.add_argument(
-                "packages",
+                "name, checked out (partial) commit/branch/tag, or worktree directory. "
+                "Multiple workspaces can be given as a comma-separated list.",
+            ),
+        ),
+        (
+            ("packages",),
+            dict(
                 nargs="*",
                 default=list(),
                 metavar="<packages>",
                 help="Packages to install into the newly created virtual environment.",
-            )
-            self.parser.add_argument(
-                "--provider",
+            ),
+        ),
+        (
+            ("--provider",),
+            dict(
                 type=str,
                 default=None,
                 choices=("stdlib",),
                 metavar="<provider>",
                 help="Provider component to use for virtual environment creation.",
-            )
-            self.parser.add_argument(
-                "--install-option",
+            ),
+        ),
+        (
+            ("--install-option",),
+            dict(
                 default=list(),
                 action="append",
                 metavar="<options>",
                 dest="options",
                 help="Additional installation options passed to the provider "
                 "component. Can be repeated with multiple options.",
-            )
-        elif subcommand == "link":
-            self.parser.add_argument(
-                "name",
+            ),
+        ),
+    ],
+    "link": [
+        (
+            ("name",),
+            dict(
                 metavar="<name>",
                 help="Information that uniquely identifies the workspace. Can be "
                 "name, checked out partial commit/branch/tag, or worktree directory.",
-            )
-            self.parser.add_argument(
-                "path",
+            ),
+        ),
+        (
+            ("path",),
+            dict(
                 metavar="<path>",
                 help="Path to the virtual environment that should be linked to the "
                 "chosen workspace.",
-            )
-        elif subcommand == "sync":
-            self.parser.add_argument(
-                "--force-create-env",
+            ),
+        ),
+    ],
+    "list": [],
+    "sync": [
+        (
+            ("--force-create-env",),
+            dict(
                 action="store_true",
                 default=False,
                 help="Create a virtual environment in-tree if linking fails.",
-            )
-        elif subcommand == "uninstall":
-            self.parser.add_argument(
-                "name",
+            ),
+        ),
+    ],
+    "uninstall": [
+        (
+            ("name",),
+            dict(
                 metavar="<name>",
                 help="Information that uniquely identifies the workspace. Can be "
-                "name, checked out (partial) commit/branch/tag, or worktree directory.",
-            )
-            self.parser.add_argument(
-                "packages",
+                "name, checked out (partial) commit/branch/tag, or worktree directory. "
+                "Multiple workspaces can be given as a comma-separated list.",
+            ),
+        ),
+        (
+            ("packages",),
+            dict(
                 nargs="*",
                 default=list(),
                 metavar="<packages>",
                 help="Packages to uninstall from the existing virtual environment.",
-            )
-            self.parser.add_argument(
-                "--uninstall-option",
+            ),
+        ),
+        (
+            ("--uninstall-option",),
+            dict(
                 default=list(),
                 action="append",
                 metavar="<options>",
                 dest="options",
                 help="Additional uninstallation options passed to the provider "
                 "component. Can be repeated with multiple options.",
-            )
+            ),
+        ),
+    ],
+}
+
+
+class WorkspaceCommand(WorkspaceManagerContextMixin, CLICommand):
+    """
+    Inspect, list, and manage pybm benchmark workspaces.
+    """
+
+    usage = (
+        "pybm workspace install <name> <packages> [<options>]\n"
+        "   or: pybm workspace link <name> <path>\n"
+        "   or: pybm workspace list\n"
+        "   or: pybm workspace sync [<options>]\n"
+        "   or: pybm workspace uninstall <name> <packages> [<options>]\n"
+    )
+
+    def __init__(self):
+        super().__init__(name="workspace")
+
+    def add_arguments(self, subcommand: str = None):
+        assert subcommand is not None, "no valid subcommand specified"
+
+        for flags, kwargs in _SUBCOMMAND_ARGS[subcommand]:
+            # copy to keep mutable defaults separate between parsers
+            self.parser.add_argument(*flags, **copy.deepcopy(kwargs))
 
     def install(self, options: argparse.Namespace):
         option_dict = vars(options)
@@ -133,9 +167,12 @@ class WorkspaceCommand(WorkspaceManagerContextMixin, CLICommand):
         install_options: List[str] = option_dict.pop("options")
 
         with self.main_context(verbose=verbose, readonly=False):
-            workspace = self.get(info)
-            venv = workspace.venv
-            venv.add(packages=packages, options=install_options).update()
+            venvs = self._get_venvs(info)
+
+            self._for_each_venv(
+                lambda venv: venv.add(packages=packages, options=install_options),
+                venvs,
+            )
 
         return SUCCESS
 
@@ -227,12 +264,36 @@ class WorkspaceCommand(WorkspaceManagerContextMixin, CLICommand):
         uninstall_options: List[str] = option_dict.pop("options")
 
         with self.main_context(verbose=verbose, readonly=False):
-            workspace = self.get(info)
-            venv = workspace.venv
-            venv.remove(packages=packages, options=uninstall_options).update()
+            venvs = self._get_venvs(info)
+
+            self._for_each_venv(
+                lambda venv: venv.remove(packages=packages, options=uninstall_options),
+                venvs,
+            )
 
         return SUCCESS
 
+    def _get_venvs(self, info: str) -> List[PythonVenv]:
+        # different identifiers can name the same workspace, and workspaces can
+        # share an environment, so deduplicate on the environment root
+        venvs: Dict[str, PythonVenv] = {}
+        for name in info.split(","):
+            venv = self.get(name).venv
+            venvs.setdefault(os.path.realpath(get_venv_root(venv.executable)), venv)
+
+        return list(venvs.values())
+
+    @staticmethod
+    def _for_each_venv(fn: Callable[[PythonVenv], PythonVenv], venvs: List[PythonVenv]):
+        if len(venvs) == 1:
+            fn(venvs[0])
+            return
+
+        # pip subprocesses are network- and I/O-bound, so threads are sufficient
+        with ThreadPoolExecutor(max_workers=min(8, len(venvs))) as executor:
+            # consuming the results re-raises exceptions from the worker threads
+            list(executor.map(fn, venvs))
+
     def run(self, args: List[str]):
         logger.debug(f"Running command `{self.format_call(args)}`.")
 
@@ -2,6 +2,7 @@ import itertools
 import logging
 import os
 from dataclasses import asdict, dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Dict, Iterable, List, MutableMapping, Union
 
@@ -22,9 +23,12 @@ from pybm.util.git import get_main_worktree
 from pybm.util.imports import import_from_module
 
 __all__ = [
+    "PipGroup",
     "PybmConfig",
+    "VenvGroup",
     "get_component",
     "get_runner_requirements",
+    "load_config",
     "config",
     "global_config",
     "LOCAL_CONFIG",
@@ -63,6 +67,17 @@ class RunnerGroup:
     contextproviders: str = ""
 
 
+@dataclass
+class PipGroup:
+    preferbinary: bool = True
+    nobuildisolation: bool = False
+
+
+@dataclass
+class VenvGroup:
+    cache: bool = True
+
+
 @dataclass
 class ReporterGroup:
     name: str = "pybm.reporters.JSONConsoleReporter"
@@ -76,6 +91,8 @@ class PybmConfig(NestedStateMixin):
     core: CoreGroup = CoreGroup()
     git: GitGroup = GitGroup()
     runner: RunnerGroup = RunnerGroup()
+    pip: PipGroup = PipGroup()
+    venv: VenvGroup = VenvGroup()
     reporter: ReporterGroup = ReporterGroup()
 
     def describe(self, attr):
@@ -148,19 +165,39 @@ class PybmConfig(NestedStateMixin):
         return itertools.chain(*(asdict(v).values() for v in self.__dict__.values()))
 
 
+def load_config(path: Union[str, Path] = LOCAL_CONFIG) -> PybmConfig:
+    """
+    Load a configuration file at most once per process. The returned object is
+    shared between callers, so use `PybmConfig.load` to obtain a config that is
+    modified and saved afterwards.
+    """
+    # normalize first, since the cache tells apart e.g. default and given arguments
+    return _load_config(os.path.abspath(path))
+
+
+@lru_cache(maxsize=None)
+def _load_config(path: str) -> PybmConfig:
+    return PybmConfig.load(path)
+
+
 if Path(LOCAL_CONFIG).exists():
-    config = PybmConfig.load()
+    config = load_config(LOCAL_CONFIG)
 else:
     config = PybmConfig()
 
 if Path(GLOBAL_CONFIG).exists():
-    global_config = PybmConfig.load(GLOBAL_CONFIG)
+    global_config = load_config(GLOBAL_CONFIG)
 else:
     global_config = None
 
 
+@lru_cache(maxsize=None)
+def _get_component_class(name: str):
+    return import_from_module(name)
+
+
 def get_component(kind: 'Literal["reporter", "runner"]'):
-    cls = import_from_module(config.get_value(f"{kind}.name"))
+    cls = _get_component_class(config.get_value(f"{kind}.name"))
     return cls()
 
 
@@ -204,6 +241,24 @@ description_db: Dict[str, Dict[str, str]] = {
         "the resulting JSON files. A context provider in pybm takes no arguments and "
         "returns two strings used as key and value for the benchmark context object.",
     },
+    "pip": {
+        "preferbinary": "Whether to pass the '--prefer-binary' option to "
+        "`pip install`. This makes pip choose wheels over source distributions even "
+        "if the source distribution is of a newer version, which avoids slow package "
+        "builds.",
+        "nobuildisolation": "Whether to pass the '--no-build-isolation' option to "
+        "`pip install`. Source distributions are then built in the target virtual "
+        "environment instead of a freshly created isolated one, which saves time, "
+        "but requires all build dependencies to be installed already. Only enable "
+        "this for trusted requirements.",
+    },
+    "venv": {
+        "cache": "Whether to archive newly created virtual environments in the pybm "
+        "cache directory (~/.cache/pybm/venvs, or %LOCALAPPDATA%\\pybm\\cache\\venvs "
+        "on Windows). Environments created afterwards from the same interpreter with "
+        "the same options are then restored from the archive instead of being built "
+        "from scratch. To free disk space, delete the cache directory at any time.",
+    },
     "reporter": {
         "name": "Name of the reporter class used in pybm to report and compare "
         "benchmark results. If you want to supply your own custom reporter class, "
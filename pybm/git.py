@@ -1,22 +1,38 @@
 """Small Git worktree wrapper for operating on a repository via Python."""
 import contextlib
+import io
+import subprocess
+import sys
+import weakref
 from pathlib import Path
-from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from pybm.config import config
 from pybm.exceptions import GitError
 from pybm.logging import get_logger
-from pybm.util.common import lfilter, lmap, version_string
+from pybm.util.common import version_string
 from pybm.util.formatting import abbrev_home
 from pybm.util.git import (
-    GIT_VERSION,
     disambiguate_info,
+    get_git_version,
     is_main_worktree,
+    is_valid_sha_part,
     map_commits_to_tags,
     resolve_ref,
 )
 from pybm.util.path import current_folder
-from pybm.util.subprocess import run_subprocess
+from pybm.util.subprocess import run_subprocess, run_subprocess_stream
 
 # major, minor, micro
 VersionTuple = Tuple[int, int, int]
@@ -40,6 +56,38 @@ class GitWorktree(NamedTuple):
         else:
             return self.commit, "commit"
 
+    @classmethod
+    def from_block(
+        cls, lines: Iterable[str], commit_tag_mapping: Dict[str, str]
+    ) -> "GitWorktree":
+        """Create a worktree from the lines of its `git worktree list` record."""
+        root, commit, branch = "", "", None
+        locked = prunable = False
+
+        for line in lines:
+            # attribute and value are separated by the first space. Splitting
+            # the whole block on whitespace instead breaks on paths with spaces
+            # and on value-less lines like "detached" or "locked".
+            attr, _, value = line.partition(" ")
+
+            # TODO: Handle bare worktrees (disallow?)
+            if attr == "worktree":
+                root = value
+            elif attr == "HEAD":
+                # value is commit SHA
+                commit = value
+            elif attr == "branch":
+                # all branches are implicitly locally tracked
+                branch = value.split("/")[-1]
+            elif attr == "locked":
+                locked = True
+            elif attr == "prunable":
+                prunable = True
+
+        # branch stays None with a detached HEAD
+        tag = commit_tag_mapping.get(commit, None)
+        return cls(root, commit, branch, tag, locked, prunable)
+
     def is_main(self) -> bool:
         return is_main_worktree(self.root)
 
@@ -81,35 +129,148 @@ _git_worktree_flags = {
     "remove": {"force": {True: "-f", False: None}},
 }
 
+# command -> (minimum git version, option -> value -> (flag, minimum git version))
+_command_table: Dict[
+    str, Tuple[VersionTuple, Dict[str, Dict[bool, Tuple[Optional[str], VersionTuple]]]]
+] = {
+    command: (
+        command_version,
+        {
+            option: {
+                value: (flag, _git_option_versions[command].get(flag, command_version))
+                for value, flag in values.items()
+            }
+            for option, values in _git_worktree_flags.get(command, {}).items()
+        },
+    )
+    for command, command_version in _git_worktree_versions.items()
+}
+
 logger = get_logger(__name__)
 
 
+# x: attribute of a listed worktree, value: user input
+def _match_root(x: str, value: str) -> bool:
+    return value == Path(x).name
+
+
+def _match_commit(x: str, value: str) -> bool:
+    # partial commit match
+    return value in x
+
+
+def _match_ref(x: Optional[str], value: str) -> bool:
+    # detached worktrees have no branch, and most commits have no tag
+    return x is not None and value == x.split("/", maxsplit=2)[-1]
+
+
+_ATTR_MATCHERS: Dict[str, Callable[[Any, str], bool]] = {
+    "root": _match_root,
+    "commit": _match_commit,
+    "branch": _match_ref,
+    "tag": _match_ref,
+}
+
+
+def _close_process(process: subprocess.Popen) -> None:
+    # closing stdin makes `git cat-file --batch-check` exit on its own
+    if process.stdin is not None:
+        process.stdin.close()
+    process.wait()
+
+
+class _GitPorcelainSession:
+    """
+    Long-running `git cat-file --batch-check` process for resolving object names,
+    which avoids starting a new git process for every lookup.
+    """
+
+    def __init__(self):
+        self._process: Optional[subprocess.Popen] = None
+        self._finalizer: Optional[weakref.finalize] = None
+
+    def _get_process(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch-check=%(objectname) %(objecttype)"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                encoding="utf-8",
+            )
+            self._finalizer = weakref.finalize(self, _close_process, self._process)
+
+        return self._process
+
+    def close(self) -> None:
+        if self._finalizer is not None:
+            self._finalizer()
+        self._process, self._finalizer = None, None
+
+    def resolve_object(self, name: str) -> Optional[Tuple[str, str]]:
+        """Return SHA and type of the object `name`, or None if it does not exist."""
+        process = self._get_process()
+        assert process.stdin is not None and process.stdout is not None
+
+        process.stdin.write(name + "\n")
+        process.stdin.flush()
+
+        # unknown objects are answered with "<name> missing" or "<name> ambiguous"
+        sha, _, object_type = process.stdout.readline().rstrip().rpartition(" ")
+        if not sha or object_type in ("missing", "ambiguous"):
+            return None
+
+        return sha, object_type
+
+    def resolve_commit(self, ref: str) -> str:
+        # peel tags and branches to the commit they point to
+        resolved = self.resolve_object(ref + "^{commit}")
+        if resolved is None:
+            raise GitError(f"Input {ref!r} did not resolve to a commit.")
+
+        return resolved[0]
+
+
 @contextlib.contextmanager
 def git_worktree_context(
-    action: str, ref: str, ref_type: str, directory: Union[str, Path]
+    action: str,
+    ref: str,
+    ref_type: str,
+    directory: Union[str, Path],
+    verbose: bool = False,
 ):
+    # collect the report and write it to stdout in one go on exit
+    buffer = io.StringIO()
     try:
         new_or_existing = "new" if action == "create" else "existing"
         where = "to new" if action == "move" else "in"
+        # abbreviating resolves the path, so do it only once
+        location = abbrev_home(directory)
 
         if action.endswith("e"):
             action = action[:-1]
-        print(
-            f"{action.capitalize()}ing {new_or_existing} worktree for {ref_type} "
-            f"{ref!r} {where} location {abbrev_home(directory)}.....",
-            end="",
-        )
+        if verbose:
+            sys.stdout.write(
+                f"{action.capitalize()}ing {new_or_existing} worktree for {ref_type} "
+                f"{ref!r} {where} location {location}....."
+            )
+            sys.stdout.flush()
 
         yield
 
-        print("done.")
-        print(
+        if verbose:
+            buffer.write("done.\n")
+        buffer.write(
             f"Successfully {action}ed {new_or_existing} worktree for {ref_type} "
-            f"{ref!r} {where} location {abbrev_home(directory)}."
+            f"{ref!r} {where} location {location}.\n"
         )
     except GitError:
-        print("failed.")
+        if verbose:
+            buffer.write("failed.\n")
         raise
+    finally:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
 
 
 class GitWorktreeWrapper:
@@ -118,19 +279,36 @@ class GitWorktreeWrapper:
     def __init__(self):
         # self.command_db = _git_worktree_flags
         self.base_dir: Path = Path(config.get_value("git.basedir"))
-
-    def _prepare_subprocess_args(self, command: str, *args, **kwargs):
+        self._session = _GitPorcelainSession()
+        try:
+            self._installed_git_version = get_git_version()
+        except GitError:
+            self._installed_git_version = (0, 0, 0)
+        # result of the last `git worktree list`, reset after worktree changes
+        self._worktrees: Optional[List[GitWorktree]] = None
+        self._unparsed: Iterator[GitWorktree] = iter(())
+
+    def _prepare_subprocess_args(
+        self, command: str, *args, **kwargs
+    ) -> Tuple[List[str], VersionTuple, str]:
         call_args = ["git", "worktree", command, *args]
 
         # parse git command line args separately
-        call_args += self._parse_flags(command, **kwargs)
+        flags, min_version, offender = self._parse_flags(command, **kwargs)
+        call_args += flags
 
-        return call_args
+        return call_args, min_version, offender
 
     @staticmethod
-    def _parse_flags(command: str, **kwargs):
+    def _parse_flags(command: str, **kwargs) -> Tuple[List[str], VersionTuple, str]:
+        assert (
+            command in _command_table
+        ), f"unimplemented git worktree command {command!r}."
+
         flags = []
-        command_options = _git_worktree_flags[command]
+        min_version, command_options = _command_table[command]
+        # log offender and type (command/switch) for dynamic errors
+        offender = command
 
         for k, v in kwargs.items():
             if k not in command_options:
@@ -140,49 +318,52 @@ class GitWorktreeWrapper:
                 )
                 continue
 
-            cmd_opts = command_options[k]
-            flag = cmd_opts[v]
+            flag, version = command_options[k][v]
 
             if flag is not None:
                 flags.append(flag)
+                if version > min_version:
+                    min_version, offender = version, flag
 
-        return flags
+        return flags, min_version, offender
 
     def _run_command(self, worktree_command: str, *args, **kwargs) -> Tuple[int, str]:
-        command = self._prepare_subprocess_args(worktree_command, *args, **kwargs)
+        command, min_version, offender = self._prepare_subprocess_args(
+            worktree_command, *args, **kwargs
+        )
 
         # check call args against git version
-        self._feature_guard(command)
+        self._feature_guard(command, min_version, offender)
 
         logger.debug(f"Running command `{' '.join(command)}`.")
 
-        return run_subprocess(command=command, ex_type=GitError)
+        try:
+            return run_subprocess(command=command, ex_type=GitError)
+        finally:
+            # every command except `list` may change the worktrees, even on failure
+            if worktree_command != "list":
+                self._worktrees = None
 
     def get_main_worktree(self) -> GitWorktree:
         # main worktree is always listed first
-        return self.list()[0]
+        return next(self.iter_worktrees())
 
     def get_worktree_by_attr(
         self, attr: str, value: str, verbose: bool = False
     ) -> Optional[GitWorktree]:
-        # value: user-input, x: worktree object from `self.list()`
-        attr_checks = {
-            "root": lambda x: Path(value).name == Path(x).name,
-            "commit": lambda x: value in x,  # partial commit match
-            "branch": lambda x: value == x.split("/", maxsplit=2)[-1],
-            "tag": lambda x: value == x.split("/", maxsplit=2)[-1],
-        }
-
-        assert attr in attr_checks, f"illegal worktree attribute {attr!r}"
+        assert attr in _ATTR_MATCHERS, f"illegal worktree attribute {attr!r}"
 
         # TODO: What to do here if someone force-checks out the same ref twice?
         if verbose:
             print(f"Matching git worktree with {attr} {value!r}.....", end="")
 
+        match = _ATTR_MATCHERS[attr]
+        # roots are compared by their final component only
+        needle = Path(value).name if attr == "root" else value
+
         try:
-            match = attr_checks[attr]
             worktree = next(
-                worktree for worktree in self.list() if match(getattr(worktree, attr))
+                wt for wt in self.iter_worktrees() if match(getattr(wt, attr), needle)
             )
 
             if verbose:
@@ -196,27 +377,78 @@ class GitWorktreeWrapper:
                 print("failed.")
             return None
 
-    @staticmethod
-    def _feature_guard(command: List[str]) -> None:
-        worktree_command, *rest = command[2:]
-        assert (
-            worktree_command in _git_worktree_flags
-        ), f"unimplemented git worktree command {worktree_command!r}."
+    def find_worktree(
+        self, info: str
+    ) -> Tuple[Optional[GitWorktree], Optional[str]]:
+        """
+        Find the worktree that `info` identifies by root, commit, branch or tag,
+        in a single pass over the worktrees. Like `disambiguate_info`, `info` is
+        only matched against worktree roots if it names an existing directory in
+        the current working directory or its parent, and a root match takes
+        precedence over a commit, branch or tag match, in that order.
+        Returns the worktree and the matched attribute, or a pair of Nones if no
+        worktree matches.
+        """
+        name = Path(info).name
+        is_path = Path(info).exists() or (Path.cwd().parent / info).exists()
+        # only (partial) SHAs can identify a commit
+        is_sha = is_valid_sha_part(info)
+
+        # first match per attribute, in case no worktree root matches
+        matches: Dict[str, GitWorktree] = {}
+
+        for worktree in self.iter_worktrees():
+            if is_path and name == Path(worktree.root).name:
+                return worktree, "root"
+            if is_sha and info in worktree.commit:
+                matches.setdefault("commit", worktree)
+            if info == worktree.branch:
+                matches.setdefault("branch", worktree)
+            if info == worktree.tag:
+                matches.setdefault("tag", worktree)
+
+        for attr in ("commit", "branch", "tag"):
+            if attr in matches:
+                return matches[attr], attr
+
+        return None, None
+
+    def _get_worktree(
+        self, attr: Optional[str], info: str, verbose: bool = False
+    ) -> GitWorktree:
+        if attr is not None:
+            worktree = self.get_worktree_by_attr(attr, info, verbose=verbose)
+        else:
+            worktree, attr = self.find_worktree(info)
 
-        min_version = _git_worktree_versions[worktree_command]
-        options = _git_option_versions[worktree_command]
-        # log offender and type (command/switch) for dynamic errors
-        offender: str = worktree_command
+            if worktree is not None and verbose:
+                print(
+                    f"Given identifier {info!r} was determined to be the {attr!r} "
+                    f"attribute of the desired worktree."
+                )
+
+        if worktree is None:
+            # only classify the input to explain the failure
+            attr = attr or disambiguate_info(info)
+
+            if not attr:
+                # TODO: Display close matches if present
+                msg = (
+                    f"Argument {info!r} was not recognized as an attribute of an "
+                    f"existing worktree."
+                )
+                raise GitError(msg)
+
+            raise GitError(f"Worktree with {attr} {info!r} does not exist.")
 
-        for k in lfilter(lambda x: x.startswith("-"), rest):
-            if k in options:
-                contender: VersionTuple = options[k]
-                if contender > min_version:
-                    min_version = contender
-                    offender = k
+        return worktree
 
-        if GIT_VERSION < min_version:
-            minimum, actual = version_string(min_version), version_string(GIT_VERSION)
+    def _feature_guard(
+        self, command: List[str], min_version: VersionTuple, offender: str
+    ) -> None:
+        installed = self._installed_git_version
+        if installed < min_version:
+            minimum, actual = version_string(min_version), version_string(installed)
             of_type = "switch" if offender.startswith("-") else "command"
 
             msg = (
@@ -239,7 +471,11 @@ class GitWorktreeWrapper:
         resolve_commits: bool = False,
         verbose: bool = False,
     ):
-        ref, ref_type = resolve_ref(commit_ish, resolve_commits=resolve_commits)
+        ref, ref_type = resolve_ref(commit_ish, resolve_commits=False)
+
+        # force commit resolution, leads to detached HEAD
+        if resolve_commits:
+            ref, ref_type = self._session.resolve_commit(ref), "commit"
 
         if verbose:
             print(f"Interpreting given reference {commit_ish!r} as a {ref_type} name.")
@@ -269,51 +505,73 @@ class GitWorktreeWrapper:
             # create branch with HEAD commit_ish and check it out in the new worktree
             args += [f"-b {create_branch}"]
 
-        with git_worktree_context("add", ref, ref_type, destination):
+        with git_worktree_context("add", ref, ref_type, destination, verbose):
             self._run_command("add", *args, force=force, checkout=checkout, lock=lock)
 
-        # return worktree by attribute search
-        return self.get_worktree_by_attr("root", destination)
+        # everything about the new worktree is known, no need to list them again
+        commit = self._session.resolve_commit(ref)
+
+        return GitWorktree(
+            root=str(Path(destination).resolve()),
+            commit=commit,
+            branch=create_branch or (ref if ref_type == "branch" else None),
+            # like in the listing, any tag pointing to the commit is reported
+            tag=map_commits_to_tags().get(commit, None),
+            locked=lock,
+        )
+
+    def _stream_worktrees(self) -> Iterator[GitWorktree]:
+        command, min_version, offender = self._prepare_subprocess_args(
+            "list", porcelain=True
+        )
+        self._feature_guard(command, min_version, offender)
 
-    def list(self, porcelain: bool = True) -> List[GitWorktree]:
         commit_tag_mapping = map_commits_to_tags()
 
-        def _process(info: str) -> GitWorktree:
-            worktree_obj: Dict[str, Union[str, bool, None]] = {}
+        logger.debug(f"Running command `{' '.join(command)}`.")
 
-            for line in info.splitlines():
+        # records are parsed as soon as git has written them
+        with run_subprocess_stream(command, ex_type=GitError) as stdout:
+            block: List[str] = []
+            for line in stdout:
+                line = line.rstrip("\n")
+                if line:
+                    block.append(line)
+                elif block:
+                    # porcelain outputs are separated with an empty line
+                    yield GitWorktree.from_block(block, commit_tag_mapping)
+                    block = []
+
+            if block:
+                yield GitWorktree.from_block(block, commit_tag_mapping)
+
+    def iter_worktrees(self) -> Iterator[GitWorktree]:
+        if self._worktrees is None:
+            # records are parsed on first use, so early matches skip the rest
+            self._worktrees = []
+            self._unparsed = self._stream_worktrees()
+
+        worktrees, i = self._worktrees, 0
+        while True:
+            if i == len(worktrees):
+                # stop if the listing was invalidated in the meantime
+                if self._worktrees is not worktrees:
+                    return
                 try:
-                    attr, value = line.split(maxsplit=1)
-                except ValueError:
-                    # no value, e.g. with detached HEAD, or locked without reason
-                    attr, value = line, ""
-
-                # TODO: Handle bare worktrees (disallow?)
-                if attr == "worktree":
-                    worktree_obj["root"] = value
-                elif attr == "HEAD":
-                    # value is commit SHA
-                    worktree_obj["commit"] = value
-                    worktree_obj["tag"] = commit_tag_mapping.get(value, None)
-                elif attr == "branch":
-                    # all branches are implicitly locally tracked
-                    worktree_obj["branch"] = value.split("/")[-1]
-                elif attr == "detached":
-                    worktree_obj["branch"] = None
-                elif attr == "locked":
-                    worktree_obj["locked"] = True
-                elif attr == "prunable":
-                    worktree_obj["prunable"] = True
-
-            # locked and prunable are false by default in class spec
-            return GitWorktree(**worktree_obj)  # type: ignore
-
-        _, output = self._run_command("list", porcelain=porcelain)
-
-        # porcelain outputs are separated with an empty line
-        attr_list = output.strip().split("\n\n")
-
-        return lmap(_process, attr_list)
+                    worktree = next(self._unparsed, None)
+                except BaseException:
+                    # a failed listing must not stay cached as complete
+                    self._worktrees, self._unparsed = None, iter(())
+                    raise
+                if worktree is None:
+                    return
+                worktrees.append(worktree)
+
+            yield worktrees[i]
+            i += 1
+
+    def list(self) -> List[GitWorktree]:
+        return list(self.iter_worktrees())
 
     def move(
         self,
@@ -322,20 +580,7 @@ class GitWorktreeWrapper:
         new_path: Union[str, Path],
         verbose: bool = False,
     ):
-        attr = attr or disambiguate_info(info)
-
-        if not attr:
-            # TODO: Display close matches if present
-            msg = (
-                f"Argument {info!r} was not recognized as an attribute of an existing "
-                f"worktree."
-            )
-            raise GitError(msg)
-
-        worktree = self.get_worktree_by_attr(attr, info, verbose=verbose)
-
-        if worktree is None:
-            raise GitError(f"Worktree with {attr} {info!r} does not exist.")
+        worktree = self._get_worktree(attr, info, verbose=verbose)
 
         ref, ref_type = worktree.get_ref_and_type()
         root = worktree.root
@@ -344,58 +589,30 @@ class GitWorktreeWrapper:
             # no-op
             return
 
-        with git_worktree_context("move", ref, ref_type, root):
+        with git_worktree_context("move", ref, ref_type, root, verbose):
             self._run_command("move", str(new_path))
 
     def remove(self, info: str, force=False, verbose: bool = False):
-        attr = disambiguate_info(info)
-
-        if not attr:
-            # TODO: Display close matches if present
-            msg = (
-                f"Argument {info!r} was not recognized as an attribute of an existing "
-                f"worktree."
-            )
-            raise GitError(msg)
-
-        if verbose:
-            print(
-                f"Given identifier {info!r} was determined to be the {attr!r} "
-                f"attribute of the desired worktree."
-            )
-
-        worktree = self.get_worktree_by_attr(attr, info, verbose=verbose)
-
-        if worktree is None:
-            raise GitError(f"Worktree with {attr} {info!r} does not exist.")
+        worktree = self._get_worktree(None, info, verbose=verbose)
 
         ref, ref_type = worktree.get_ref_and_type()
         destination = worktree.root
 
-        with git_worktree_context("remove", ref, ref_type, destination):
+        # the listing that matched the worktree stays valid apart from the removal
+        remaining = [wt for wt in self.list() if wt.root != destination]
+
+        with git_worktree_context("remove", ref, ref_type, destination, verbose):
             self._run_command("remove", destination, force=force)
 
+        self._worktrees, self._unparsed = remaining, iter(())
+
         return worktree
 
     def repair(self, attr: Optional[str], info: str, verbose: bool = False):
-        # avoid expensive call if attr is given
-        attr = attr or disambiguate_info(info)
-
-        if not attr:
-            # TODO: Display close matches if present
-            msg = (
-                f"Argument {info!r} was not recognized as an attribute of an existing "
-                f"worktree."
-            )
-            raise GitError(msg)
-
-        worktree = self.get_worktree_by_attr(attr, info, verbose=verbose)
-
-        if worktree is None:
-            raise GitError(f"Worktree with {attr} {info!r} does not exist.")
+        worktree = self._get_worktree(attr, info, verbose=verbose)
 
         ref, ref_type = worktree.get_ref_and_type()
         root = worktree.root
 
-        with git_worktree_context("repair", ref, ref_type, root):
+        with git_worktree_context("repair", ref, ref_type, root, verbose):
             self._run_command("repair", root)
@@ -151,7 +151,7 @@ def list_branches(
 
     if names_only:
         # only split off the remote name by maxsplit=1
-        branches = list(set([b.split("/", maxsplit=1)[-1] for b in branches]))
+        branches = list(dict.fromkeys(b.split("/", maxsplit=1)[-1] for b in branches))
 
     return branches
 
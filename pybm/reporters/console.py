@@ -1,6 +1,9 @@
 import copy
+import re
 from collections import defaultdict
-from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import chain
 from statistics import mean, stdev
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -15,10 +18,8 @@ from pybm.reporters.util import (
     transform_key,
 )
 from pybm.util.common import (
-    dfilter_regex,
+    dfilter_compiled,
     dvmap,
-    flatten,
-    lmap,
     partition_n,
     safe_index,
 )
@@ -31,6 +32,14 @@ from pybm.util.formatting import (
 )
 from pybm.util.path import get_subdirs
 
+# timing columns subject to time unit rescaling
+_TIME_RE = re.compile(r"\w+_(time|coefficient)")
+
+
+@lru_cache(maxsize=None)
+def _get_rescale_fn(current_unit: Optional[str], target_unit: str):
+    return partial(rescale, current_unit=current_unit, target_unit=target_unit)
+
 
 def compare(results: List[Dict[str, Any]], refs: Tuple[str, ...]):
     """Compare results between different refs with respect to an anchor ref. Assumes
@@ -60,6 +69,53 @@ def compare(results: List[Dict[str, Any]], refs: Tuple[str, ...]):
     return results
 
 
+# kinds of formatted columns
+_RELATIVE, _SPEEDUP, _FLOAT, _NAME, _OTHER = range(5)
+
+ColumnPlan = Tuple[Tuple[str, str, int], ...]
+
+# column plans by time unit and (key, value type) pairs of a benchmark
+_column_plans: Dict[Tuple[Any, ...], ColumnPlan] = {}
+
+
+def _make_column_plan(bm: Dict[str, Any], time_unit: str) -> ColumnPlan:
+    plan = []
+
+    for key, value in sort_benchmark(bm).items():
+        tkey = transform_key(key)
+
+        if key.startswith("delta"):
+            kind = _RELATIVE
+        elif key == "speedup":
+            kind = _SPEEDUP
+        # general float columns that are not relative/speedup
+        elif isinstance(value, float):
+            tkey += f" ({time_unit})"
+            kind = _FLOAT
+        elif key == "benchmark_name":
+            kind = _NAME
+        else:
+            kind = _OTHER
+
+        plan.append((key, tkey, kind))
+
+    return tuple(plan)
+
+
+def _get_column_plan(bm: Dict[str, Any], time_unit: str) -> ColumnPlan:
+    """
+    Return the order, display names and formatters of the columns of a benchmark.
+    Rows sharing their columns and value types reuse the same plan.
+    """
+    signature = (time_unit, *((k, type(v)) for k, v in bm.items()))
+
+    plan = _column_plans.get(signature)
+    if plan is None:
+        plan = _column_plans[signature] = _make_column_plan(bm, time_unit)
+
+    return plan
+
+
 def format(aggregates: List[Dict[str, Any]], time_unit: str, digits: int):
     mean_agg = stddev_agg = {}
 
@@ -72,22 +128,19 @@ def format(aggregates: List[Dict[str, Any]], time_unit: str, digits: int):
 
     assert mean_agg, "missing mean aggregate result"
 
-    sorted_bm = sort_benchmark(mean_agg)
     transformed = {}
 
-    for key, value in sorted_bm.items():
-        tkey = transform_key(key)
+    for key, tkey, kind in _get_column_plan(mean_agg, time_unit):
+        value = mean_agg[key]
 
-        if key.startswith("delta"):
+        if kind == _RELATIVE:
             tvalue = format_relative(value, digits=digits)
-        elif key == "speedup":
+        elif kind == _SPEEDUP:
             tvalue = format_speedup(value, digits=digits)
-        # general float columns that are not relative/speedup
-        elif isinstance(value, float):
-            tkey += f" ({time_unit})"
+        elif kind == _FLOAT:
             std = stddev_agg.get(key, None)
             tvalue = format_floating(value, digits=digits, std=std, as_integers=False)
-        elif key == "benchmark_name":
+        elif kind == _NAME:
             tvalue = value.rsplit("_", maxsplit=1)[0]
         else:
             tvalue = str(value)
@@ -109,9 +162,9 @@ def process(bm: Dict[str, Any], time_unit: str, shalength: int):
     current_unit: Optional[str] = bm.pop("time_unit", None)
 
     if time_unit is not None:
-        time_values: Dict[str, Any] = dfilter_regex(r"\w+_(time|coefficient)", bm)
+        time_values: Dict[str, Any] = dfilter_compiled(_TIME_RE, bm)
 
-        rescale_fn = partial(rescale, current_unit=current_unit, target_unit=time_unit)
+        rescale_fn = _get_rescale_fn(current_unit, time_unit)
 
         bm.update(dvmap(rescale_fn, time_values))
 
@@ -173,9 +226,8 @@ class JSONConsoleReporter(BaseReporter):
     ):
         results = sorted(get_subdirs(self.result_dir), key=int)[: -previous - 1 : -1]
 
-        benchmarks = []
-        for result in results:
-            benchmarks += self.read(
+        def _read(result: str) -> List[Dict[str, Any]]:
+            return self.read(
                 *refs,
                 result=result,
                 target_filter=target_filter,
@@ -183,13 +235,22 @@ class JSONConsoleReporter(BaseReporter):
                 context_filter=context_filter,
             )
 
+        if len(results) <= 1:
+            reads = [_read(result) for result in results]
+        else:
+            # reading result files is I/O bound, map keeps the results in order
+            with ThreadPoolExecutor(max_workers=min(32, len(results))) as executor:
+                reads = list(executor.map(_read, results))
+
+        benchmarks = list(chain.from_iterable(reads))
+
         process_fn = partial(
             process,
             time_unit=self.target_time_unit,
             shalength=self.shalength,
         )
 
-        benchmarks = lmap(process_fn, benchmarks)
+        benchmarks = [process_fn(bm) for bm in benchmarks]
 
         repetitions, aggregates = partition_n(
             2,
@@ -200,16 +261,18 @@ class JSONConsoleReporter(BaseReporter):
         # aggregate results with the same name and commit
         # TODO: Add timestamp
         if not aggregates:
-            aggregates = flatten(
-                [
+            aggregates = list(
+                chain.from_iterable(
                     reduce(group)
                     for group in groupby(["family_index", "commit"], repetitions)
-                ]
+                )
             )
 
         if not absolute:
-            aggregates = flatten(
-                [compare(group, refs=refs) for group in groupby(["name"], aggregates)]
+            aggregates = list(
+                chain.from_iterable(
+                    compare(group, refs=refs) for group in groupby(["name"], aggregates)
+                )
             )
 
         schema = infer_schema(aggregates)
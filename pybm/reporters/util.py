@@ -2,7 +2,7 @@ import collections
 import typing
 from typing import Any, Callable, Dict, Iterable, List, Union
 
-from pybm.util.common import lmap, partition_n, safe_index
+from pybm.util.common import lmap, safe_index
 from pybm.util.formatting import make_line, make_separator
 
 # metric time units
@@ -66,14 +66,17 @@ def groupby(attr, results: Iterable[Dict[str, Any]]):
     if isinstance(attr, str):
         attr = [attr]
 
-    unique = get_unique(attr, results)
+    def key_fn(x: Dict[str, Any]):
+        if isinstance(attr, list):
+            return tuple(x[at] for at in attr)
+        return attr(x)
 
-    if isinstance(attr, list):
-        return partition_n(
-            len(unique), lambda x: unique.index(tuple(x[at] for at in attr)), results
-        )
-    else:
-        return partition_n(len(unique), lambda x: unique.index(attr(x)), results)
+    # single pass, groups are ordered by first occurrence of their key
+    groups: Dict[Any, List[Dict[str, Any]]] = {}
+    for result in results:
+        groups.setdefault(key_fn(result), []).append(result)
+
+    return list(groups.values())
 
 
 def infer_schema(benchmarks: List[Dict[str, Any]]) -> Schema:
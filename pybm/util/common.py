@@ -1,5 +1,5 @@
 import re
-from typing import Callable, Dict, Iterable, List, Tuple, TypeVar, Union
+from typing import Callable, Dict, Iterable, List, Pattern, Tuple, TypeVar, Union
 
 T = TypeVar("T")
 S = TypeVar("S")
@@ -84,7 +84,11 @@ def lfilter_regex(expr: str, iterable: Iterable[str]) -> List[str]:
 
 def dfilter_regex(expr: str, dictionary: Dict[str, T]) -> Dict[str, T]:
     pattern = re.compile(expr)
-    return dkfilter(lambda x: pattern.search(x) is not None, dictionary)
+    return dfilter_compiled(pattern, dictionary)
+
+
+def dfilter_compiled(pattern: Pattern[str], dictionary: Dict[str, T]) -> Dict[str, T]:
+    return {k: v for k, v in dictionary.items() if pattern.search(k) is not None}
 
 
 def flatten(t):
@@ -1,6 +1,6 @@
 import re
 import typing
-from functools import partial
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
 
@@ -84,6 +84,7 @@ def get_from_history(
         git_subprocess(["git", "reset", "HEAD", "--", str(resource)])
 
 
+@lru_cache(maxsize=1)
 def get_git_version() -> Tuple[int, int, int]:
     rc, output = git_subprocess(["git", "--version"])
     # leading number, followed by multiple (dot + group of digits) exprs
@@ -158,7 +159,7 @@ def list_branches(
     branches: List[str] = branch_output.splitlines()
 
     if names_only:
-        branches = list(set([b.split("/")[-1] for b in branches]))
+        branches = list(dict.fromkeys(b.split("/")[-1] for b in branches))
 
     return branches
 
@@ -1,7 +1,13 @@
+import contextlib
+import os
+import runpy
 import subprocess
+import sys
+import tempfile
+import traceback
 import typing
 from pathlib import Path
-from typing import List, Tuple, Union
+from typing import IO, Iterator, List, Tuple, Union
 
 from pybm.exceptions import PybmError
 
@@ -12,6 +18,84 @@ if typing.TYPE_CHECKING:
     from typing import Literal
 
 
+def _check_returncode(
+    full_command: str,
+    rc: int,
+    stdout: str,
+    stderr: str,
+    allowed_statuscodes: List[int],
+    ex_type: type,
+    errors: 'Literal["raise", "ignore"]',
+) -> Tuple[int, str]:
+    if rc not in allowed_statuscodes:
+        if errors == "raise":
+            msg = (
+                f"The command `{full_command}` returned the non-zero "
+                f"exit code {rc}.\nFurther information (stderr "
+                f"output of the subprocess):\n{stderr}"
+            )
+            raise ex_type(msg)
+        else:
+            return rc, stderr
+
+    return rc, stdout
+
+
+def run_module_forked(
+    module: str,
+    args: List[str],
+    allowed_statuscodes: List[int] = None,
+    ex_type: type = PybmError,
+    errors: 'Literal["raise", "ignore"]' = "raise",
+) -> Tuple[int, str]:
+    """
+    Run `python -m <module> <args>` in a forked child of the current interpreter,
+    which skips the interpreter startup of a fresh subprocess. Output and errors
+    are handled like in `run_subprocess`. Requires `os.fork`, i.e. a POSIX system.
+    """
+    full_command = " ".join([sys.executable, "-m", module, *args])
+
+    allowed_statuscodes = allowed_statuscodes or []
+    allowed_statuscodes.append(0)
+
+    # avoid duplicating buffered output in the child
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        pid = os.fork()
+
+        if pid == 0:
+            code = 1
+            try:
+                os.dup2(out.fileno(), sys.stdout.fileno())
+                os.dup2(err.fileno(), sys.stderr.fileno())
+                sys.argv = [module, *args]
+                runpy.run_module(module, run_name="__main__", alter_sys=True)
+                code = 0
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                # skip all cleanup inherited from the parent process
+                os._exit(code)
+
+        _, status = os.waitpid(pid, 0)
+        rc = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+
+        out.seek(0)
+        err.seek(0)
+        stdout = out.read().decode("utf-8")
+        stderr = err.read().decode("utf-8")
+
+    return _check_returncode(
+        full_command, rc, stdout, stderr, allowed_statuscodes, ex_type, errors
+    )
+
+
 def run_subprocess(
     command: List[str],
     allowed_statuscodes: List[int] = None,
@@ -32,16 +116,51 @@ def run_subprocess(
         cwd=cwd,
     )
 
-    rc = p.returncode
-    if rc not in allowed_statuscodes:
-        if errors == "raise":
-            msg = (
-                f"The command `{full_command}` returned the non-zero "
-                f"exit code {rc}.\nFurther information (stderr "
-                f"output of the subprocess):\n{p.stderr}"
-            )
-            raise ex_type(msg)
-        else:
-            return rc, p.stderr
+    return _check_returncode(
+        full_command,
+        p.returncode,
+        p.stdout,
+        p.stderr,
+        allowed_statuscodes,
+        ex_type,
+        errors,
+    )
+
 
-    return rc, p.stdout
+@contextlib.contextmanager
+def run_subprocess_stream(
+    command: List[str],
+    allowed_statuscodes: List[int] = None,
+    ex_type: type = PybmError,
+    cwd: Union[str, Path] = None,
+) -> Iterator[IO[str]]:
+    """
+    Run a command and yield its stdout to read from while the command is still
+    running. Exit codes are checked on exit like in `run_subprocess`.
+    """
+    full_command = " ".join(command)
+
+    allowed_statuscodes = allowed_statuscodes or []
+    allowed_statuscodes.append(0)
+
+    # stderr goes to a file, a pipe read only after stdout can fill up and block
+    with tempfile.TemporaryFile() as err:
+        with subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=err,
+            encoding="utf-8",
+            bufsize=-1,
+            cwd=cwd,
+        ) as p:
+            assert p.stdout is not None
+            yield p.stdout
+            # drain unread output, otherwise the process can block on a full pipe
+            p.stdout.read()
+
+        err.seek(0)
+        stderr = err.read().decode("utf-8")
+
+    _check_returncode(
+        full_command, p.returncode, "", stderr, allowed_statuscodes, ex_type, "raise"
+    )
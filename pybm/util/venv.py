@@ -1,12 +1,57 @@
+import contextlib
+import hashlib
+import itertools
+import json
 import os
+import re
+import shutil
+import tempfile
+import zipfile
 from pathlib import Path
-from typing import Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 
 from pybm.exceptions import PybmError
-from pybm.util.common import version_tuple
+from pybm.util.common import version_string, version_tuple
 from pybm.util.path import get_filenames, get_subdirs, walk
 from pybm.util.subprocess import run_subprocess
 
+if os.name == "nt":
+    PYBM_CACHE = Path(os.getenv("LOCALAPPDATA", "")) / "pybm" / "cache"
+else:
+    PYBM_CACHE = Path.home() / ".cache" / "pybm"
+
+_PIP_LAUNCHER = """#!{executable}
+# -*- coding: utf-8 -*-
+import sys
+
+from pip._internal.cli.main import main
+
+if __name__ == "__main__":
+    sys.exit(main())
+"""
+
+# records the original location of a cached virtual environment inside its archive
+_ROOT_MARKER = ".pybm-venv-root"
+# caches version and packages of a linked virtual environment
+_LINK_CACHE = ".pybm-linkcache.json"
+
+
+def _get_link_cache_key(root: Union[str, Path]) -> List[int]:
+    path = Path(root)
+    executable = os.stat(get_executable(path))
+    key = [executable.st_mtime_ns, executable.st_size]
+
+    # installing or removing packages modifies the site-packages directory
+    if os.name == "nt":
+        site_packages = [path / "Lib" / "site-packages"]
+    else:
+        site_packages = sorted(path.glob("lib/python*/site-packages"))
+
+    key += [os.stat(sp).st_mtime_ns for sp in site_packages]
+    return key
+
 
 def get_python_version(executable: str) -> Tuple[int, int, int]:
     cmd = "import sys; print('{0}.{1}.{2}'.format(*sys.version_info[:3]))"
@@ -20,6 +65,55 @@ def get_python_version(executable: str) -> Tuple[int, int, int]:
         return version_tuple(output.strip())
 
 
+def cache_venv(root: Union[str, Path], key: str) -> None:
+    """
+    Archive a freshly created virtual environment into the pybm venv cache.
+    Caching is best effort, so errors writing to the cache are ignored.
+    """
+    if shutil.which("tar") is None:
+        return
+
+    root = Path(root)
+    marker = root / _ROOT_MARKER
+    tmpfile = None
+
+    try:
+        cache_dir = PYBM_CACHE / "venvs"
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # venv writes absolute, but not symlink-resolved paths into the environment
+        marker.write_text(os.path.abspath(root))
+
+        # archive under a temporary name first, so that no partial archives are read
+        fd, tmpfile = tempfile.mkstemp(suffix=".tar", dir=cache_dir)
+        os.close(fd)
+
+        command = ["tar", "-cf", tmpfile, "-C", str(root), "."]
+        rc, _ = run_subprocess(command, errors="ignore")
+        if rc == 0:
+            os.replace(tmpfile, cache_dir / f"{key}.tar")
+    except OSError:
+        pass
+    finally:
+        with contextlib.suppress(OSError):
+            marker.unlink(missing_ok=True)
+        with contextlib.suppress(OSError):
+            if tmpfile is not None and os.path.exists(tmpfile):
+                os.remove(tmpfile)
+
+
+def get_bundled_pip(executable: str) -> Optional[Path]:
+    """Locate the pip wheel bundled with `ensurepip` in a Python installation."""
+    cmd = "import ensurepip, os; print(os.path.dirname(ensurepip.__file__))"
+    rc, output = run_subprocess([executable, "-c", cmd], errors="ignore")
+    if rc != 0:
+        return None
+
+    # some distributions (e.g. Debian) remove the bundled wheels
+    wheels = sorted((Path(output.strip()) / "_bundled").glob("pip-*.whl"))
+    return wheels[-1] if wheels else None
+
+
 def get_executable(root: Union[str, Path]) -> str:
     path = Path(root)
     if os.name == "nt":
@@ -28,6 +122,22 @@ def get_executable(root: Union[str, Path]) -> str:
         return str(path / "bin" / "python")
 
 
+def get_site_packages(root: Union[str, Path], version: Tuple[int, int, int]) -> Path:
+    path = Path(root)
+    if os.name == "nt":
+        return path / "Lib" / "site-packages"
+    else:
+        return path / "lib" / f"python{version[0]}.{version[1]}" / "site-packages"
+
+
+def get_venv_cache_key(
+    python: str, version: Tuple[int, int, int], options: List[str], name: str
+) -> str:
+    # the activation scripts use the directory name as prompt, unless set otherwise
+    key = repr((python, version, tuple(sorted(set(options))), name))
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
 def get_venv_root(executable: Union[str, Path]) -> Path:
     return Path(executable).parents[1]
 
@@ -111,3 +221,198 @@ def locate_requirements_file(path: Union[str, Path], absolute: bool = True):
         if pp.name.endswith(target_name):
             return pp
     return None
+
+
+def parse_pip_list(lines: Iterable[str]) -> Tuple[List[str], List[str]]:
+    # `pip list` output: table header, separator, package list
+    flat_pkg_table = itertools.islice(lines, 2, None)
+    packages, locations = [], []
+
+    for line in flat_pkg_table:
+        # TODO: When using pybm.Packages here, change to --format=json to parse
+        #  directly
+        split_line = line.split()
+        packages.append("==".join(split_line[:2]))
+        if len(split_line) > 2:
+            locations.append(split_line[2])
+
+    return packages, locations
+
+
+def parse_pip_report(report: str) -> Tuple[List[str], List[str]]:
+    """Parse the packages installed by pip from a JSON installation report."""
+    packages, locations = [], []
+
+    for item in json.loads(report)["install"]:
+        metadata, download_info = item["metadata"], item["download_info"]
+        packages.append(f"{metadata['name']}=={metadata['version']}")
+
+        # like in `pip list`, only editable installs have a location
+        if download_info.get("dir_info", {}).get("editable", False):
+            locations.append(url2pathname(urlparse(download_info["url"]).path))
+
+    return packages, locations
+
+
+def project_name(requirement: str) -> str:
+    """Normalized project name of a requirement string, e.g. `Foo_Bar==1.0`."""
+    name = re.split(r"[<>=!~;@\[\s]", requirement, maxsplit=1)[0]
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def supports_pip_report(packages: Iterable[str]) -> bool:
+    """
+    Check whether the pip among the given `name==version` packages supports
+    installation reports through `pip install --report`, added in pip 22.2.
+    """
+    for package in packages:
+        if project_name(package) == "pip":
+            match = re.match(r"(\d+)\.(\d+)", package.partition("==")[2])
+            return match is not None and tuple(map(int, match.groups())) >= (22, 2)
+
+    return False
+
+
+def read_link_cache(root: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """
+    Read version and package information of a virtual environment from its link
+    cache. Returns None if there is no cache, or if the interpreter or the
+    installed packages have changed since it was written.
+    """
+    try:
+        with open(Path(root) / _LINK_CACHE, "r") as cache_file:
+            cache = json.load(cache_file)
+        key = _get_link_cache_key(root)
+    except (OSError, ValueError):
+        return None
+
+    return cache if cache.get("key") == key else None
+
+
+def relocate_venv(root: Union[str, Path], old_root: Union[str, Path]) -> None:
+    """Rewrite hard-coded paths to the old location of a copied virtual environment."""
+    old, new = str(old_root).encode(), os.path.abspath(root).encode()
+    root = Path(root)
+
+    bin_dir = Path(get_executable(root)).parent
+    candidates = [root / "pyvenv.cfg", *bin_dir.iterdir()]
+
+    for path in candidates:
+        # interpreter symlinks point outside the environment
+        if path.is_symlink() or not path.is_file():
+            continue
+
+        content = path.read_bytes()
+        if old in content:
+            path.write_bytes(content.replace(old, new))
+
+
+def restore_cached_venv(root: Union[str, Path], key: str) -> bool:
+    """
+    Create a virtual environment by extracting a previously cached archive.
+    Returns False if no archive exists for the given key.
+    """
+    archive = PYBM_CACHE / "venvs" / f"{key}.tar"
+
+    if shutil.which("tar") is None or not archive.exists():
+        return False
+
+    root = Path(root)
+    root.mkdir(parents=True)
+
+    command = ["tar", "-xf", str(archive), "-C", str(root)]
+    rc, _ = run_subprocess(command, errors="ignore")
+    if rc != 0:
+        shutil.rmtree(root)
+        return False
+
+    marker = root / _ROOT_MARKER
+    old_root = marker.read_text()
+    marker.unlink()
+
+    relocate_venv(root, old_root)
+
+    return True
+
+
+def seed_pip(
+    root: Union[str, Path], python: str, version: Tuple[int, int, int]
+) -> bool:
+    """
+    Seed pip into a virtual environment created with `--without-pip` by copying
+    an extracted pip wheel from the pybm cache, similarly to virtualenv. The cache
+    is populated once per Python version from the wheel bundled with `ensurepip`.
+    Returns False if no pip wheel could be found for the given interpreter, or
+    if the cache cannot be used.
+    """
+    if os.name == "nt":
+        # pip.exe launchers cannot be written as plain scripts
+        return False
+
+    try:
+        cache_dir = PYBM_CACHE / "wheel" / version_string(version[:2])
+        seeds = sorted(cache_dir.glob("pip-*"))
+
+        if seeds:
+            seed = seeds[-1]
+        else:
+            wheel = get_bundled_pip(python)
+            if wheel is None:
+                return False
+
+            seed = cache_dir / wheel.stem
+            cache_dir.mkdir(parents=True, exist_ok=True)
+
+            # extract into a temporary directory first to make concurrent populating
+            # of the cache safe, only the first finished extraction is kept
+            tmpdir = tempfile.mkdtemp(dir=cache_dir)
+            with zipfile.ZipFile(wheel) as whl:
+                whl.extractall(tmpdir)
+            # mkdtemp creates the directory with mode 0700
+            os.chmod(tmpdir, 0o755)
+            try:
+                os.rename(tmpdir, seed)
+            except OSError:
+                shutil.rmtree(tmpdir)
+    except OSError:
+        # an unusable cache (e.g. a non-directory HOME) leaves ensurepip to do it
+        return False
+
+    # copy the contents only, copying the seed root would overwrite the mode of
+    # site-packages with that of the cache directory
+    site_packages = get_site_packages(root, version)
+    for item in seed.iterdir():
+        if item.is_dir():
+            shutil.copytree(item, site_packages / item.name, dirs_exist_ok=True)
+        else:
+            shutil.copy2(item, site_packages / item.name)
+
+    # shebangs need an absolute interpreter path
+    executable = get_executable(os.path.abspath(root))
+    bin_dir = Path(executable).parent
+    launcher = _PIP_LAUNCHER.format(executable=executable)
+
+    for name in ["pip", f"pip{version[0]}", "pip{0}.{1}".format(*version)]:
+        script = bin_dir / name
+        script.write_text(launcher)
+        script.chmod(0o755)
+
+    return True
+
+
+def write_link_cache(
+    root: Union[str, Path], version: str, packages: List[str], locations: List[str]
+) -> None:
+    cache = {
+        "key": _get_link_cache_key(root),
+        "version": version,
+        "packages": packages,
+        "locations": locations,
+    }
+
+    try:
+        with open(Path(root) / _LINK_CACHE, "w") as cache_file:
+            json.dump(cache, cache_file)
+    except OSError:
+        # not being able to cache (e.g. in a read-only location) is not an error
+        pass
@@ -2,47 +2,118 @@
 Virtual environment creation class for benchmarking with custom requirements in Python.
 """
 import contextlib
+import os
 import shutil
+import stat
+import sys
+import tempfile
+import threading
 import warnings
 from pathlib import Path
 from typing import List, Optional, Tuple, Union
 
+from pybm.config import PipGroup, VenvGroup, config
 from pybm.exceptions import PybmError
 from pybm.util.common import version_string
 from pybm.util.formatting import abbrev_home
-from pybm.util.subprocess import run_subprocess
+from pybm.util.subprocess import (
+    run_module_forked,
+    run_subprocess,
+    run_subprocess_stream,
+)
 from pybm.util.venv import (
+    cache_venv,
     get_executable,
     get_python_version,
+    get_venv_cache_key,
     get_venv_root,
     has_build_files,
     is_valid_venv,
     locate_requirements_file,
+    parse_pip_list,
+    parse_pip_report,
+    project_name,
+    read_link_cache,
+    restore_cached_venv,
+    seed_pip,
+    supports_pip_report,
+    write_link_cache,
 )
 
 
+def _write(message: str) -> None:
+    # one write and flush per message instead of one per print call
+    sys.stdout.write(message)
+    sys.stdout.flush()
+
+
+def _get_pip_option(name: str) -> bool:
+    value = config.get_value(f"pip.{name}")
+    # configs written before the pip group existed have None for its options
+    return getattr(PipGroup, name) if value is None else value
+
+
+def _use_venv_cache() -> bool:
+    value = config.get_value("venv.cache")
+    # configs written before the venv group existed have None for its options
+    return VenvGroup.cache if value is None else value
+
+
+def _pip_install_flags() -> List[str]:
+    flags = []
+    # wheels avoid building source distributions in an isolated environment
+    if _get_pip_option("preferbinary"):
+        flags.append("--prefer-binary")
+    if _get_pip_option("nobuildisolation"):
+        flags.append("--no-build-isolation")
+    return flags
+
+
+def _run_pip(executable: str, args: List[str]) -> Tuple[int, str]:
+    # pip running on pybm's own interpreter can be forked off the current process,
+    # which saves starting and initializing a new interpreter. Forking is only
+    # safe while no other threads are running.
+    if (
+        executable == sys.executable
+        and hasattr(os, "fork")
+        and threading.active_count() == 1
+    ):
+        return run_module_forked("pip", args)
+
+    return run_subprocess([executable, "-m", "pip", *args])
+
+
 @contextlib.contextmanager
 def action_context(action: str, directory: Union[str, Path]):
     try:
         new_or_existing = "new" if action == "create" else "existing"
+        # abbreviating resolves the path, so do it only once
+        location = abbrev_home(directory)
+
         if action.endswith("e"):
             action = action[:-1]
-        print(
+        _write(
             f"{action.capitalize()}ing {new_or_existing} virtual environment in "
-            f"location {abbrev_home(directory)}.....",
-            end="",
+            f"location {location}....."
         )
         yield
-        print("done.")
-        print(
-            f"Successfully {action}ed {new_or_existing} virtual environment in "
-            f"location {abbrev_home(directory)}."
+        _write(
+            f"done.\nSuccessfully {action}ed {new_or_existing} virtual environment "
+            f"in location {location}.\n"
         )
     except PybmError:
-        print("failed.")
+        _write("failed.\n")
         raise
 
 
+# progressive form, past form and preposition of each pip action
+_PIP_ACTIONS = {
+    "add": ("Adding", "added", "into"),
+    "install": ("Installing", "installed", "into"),
+    "remove": ("Removing", "removed", "from"),
+}
+
+
 @contextlib.contextmanager
 def pip_context(
     action: str,
@@ -50,30 +121,32 @@ def pip_context(
     packages: Optional[List[str]] = None,
     requirements_file: Optional[str] = None,
 ):
-    try:
-        if packages is None:
-            resource = f"from requirements file {requirements_file!r}"
-        else:
-            resource = ", ".join(packages)
-
-        root = get_venv_root(executable)
-        into_or_from = "into" if action in ["add", "install"] else "from"
+    if packages is None:
+        resource = f"from requirements file {requirements_file!r}"
+    else:
+        resource = ", ".join(packages)
+
+    location = abbrev_home(get_venv_root(executable))
+    progressive, past, into_or_from = _PIP_ACTIONS[action]
+
+    start = (
+        f"{progressive} packages {resource} {into_or_from} virtual "
+        f"environment in location {location}....."
+    )
+    # reports from worker threads are written in one piece at the end, so that
+    # concurrent pip runs do not interleave their output mid-line
+    if threading.current_thread() is threading.main_thread():
+        _write(start)
+        start = ""
 
-        if action.endswith("e"):
-            action = action[:-1]
-        print(
-            f"{action.capitalize()}ing packages {resource} {into_or_from} virtual "
-            f"environment in location {abbrev_home(root)}.....",
-            end="",
-        )
+    try:
         yield
-        print("done.")
-        print(
-            f"Successfully {action}ed packages {resource} {into_or_from} virtual "
-            f"environment in location {abbrev_home(root)}."
+        _write(
+            f"{start}done.\nSuccessfully {past} packages {resource} {into_or_from} "
+            f"virtual environment in location {location}.\n"
         )
     except PybmError:
-        print("failed.")
+        _write(f"{start}failed.\n")
         raise
 
 
@@ -95,6 +168,8 @@ class PythonVenv:
         self.version = version
         self.packages = packages or []
         self.locations = locations or []
+        # read the configured pip flags once instead of on every install
+        self.install_flags = _pip_install_flags()
 
     def add(
         self,
@@ -102,14 +177,47 @@ class PythonVenv:
         options: Optional[List[str]] = None,
     ):
 
-        command = [self.executable, "-m", "pip", "install", *packages]
+        # the JSON report lists installed packages, saving a `pip list` call after
+        with_report = supports_pip_report(self.packages)
 
-        # prepare options and extra pip install flags
-        if options:
-            command += options
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # pip logs to stdout, so the report goes to a file instead
+            report_file = os.path.join(tmpdir, "report.json")
+
+            command = ["install", "-q"]
+            if with_report:
+                command += ["--report", report_file]
+            command += self.install_flags + packages
+
+            # prepare options and extra pip install flags
+            if options:
+                command += options
+
+            with pip_context("add", self.executable, packages=packages):
+                _run_pip(self.executable, command)
 
-        with pip_context("add", self.executable, packages=packages):
-            run_subprocess(command)
+                if not with_report:
+                    self.update()
+                    return self
+
+                try:
+                    with open(report_file, "r") as f:
+                        installed, locations = parse_pip_report(f.read())
+                except (OSError, ValueError, KeyError):
+                    # the packages are installed already, so ask pip instead
+                    self.update()
+                    return self
+
+        names = {project_name(pkg) for pkg in installed}
+
+        # newly installed versions replace previously installed ones
+        current = [p for p in self.packages if project_name(p) not in names]
+        new_locations = [loc for loc in locations if loc not in self.locations]
+
+        self._set_packages(
+            sorted(current + installed, key=project_name),
+            self.locations + new_locations,
+        )
 
         return self
 
@@ -134,25 +242,63 @@ class PythonVenv:
 
             with action_context("link", directory=self.directory):
                 self.executable = get_executable(self.directory)
-                self.version = version_string(get_python_version(self.executable))
-                self.packages, self.locations = self.list()
+
+                # skip the version and `pip list` subprocesses if nothing changed
+                cache = read_link_cache(self.directory)
+
+                if cache is not None:
+                    self.version = cache["version"]
+                    self.packages = cache["packages"]
+                    self.locations = cache["locations"]
+                else:
+                    self.version = version_string(get_python_version(self.executable))
+                    self.packages, self.locations = self.list()
+                    write_link_cache(
+                        self.directory, self.version, self.packages, self.locations
+                    )
 
                 return self
         else:
             # THIS LINE IS EXTREMELY IMPORTANT. Resolve symlinks if the given Python
             # interpreter was a symlink to begin with.
-            python = str(Path(self.executable).resolve())
+            python = os.path.realpath(self.executable)
+            version = get_python_version(python)
+
+            options = options or []
+            # seeding pip from the cache is much faster than `ensurepip`, but
+            # the pip upgrade of `--upgrade-deps` needs a working pip during creation
+            with_seed = os.name != "nt" and not any(
+                opt in options for opt in ["--without-pip", "--upgrade-deps"]
+            )
 
-            command = [python, "-m", "venv", str(self.directory)]
+            command = [python, "-m", "venv", str(self.directory), *options]
 
-            if options:
-                command += options
+            if with_seed:
+                command += ["--without-pip"]
 
-            with action_context("create", directory=self.directory):
-                run_subprocess(command)
+            # identical interpreter and options result in identical environments
+            cache_key = get_venv_cache_key(
+                python, version, options, self.directory.name
+            )
 
+            with action_context("create", directory=self.directory):
                 self.executable = get_executable(self.directory)
-                self.version = version_string(get_python_version(self.executable))
+
+                use_cache = _use_venv_cache()
+
+                if not (use_cache and restore_cached_venv(self.directory, cache_key)):
+                    run_subprocess(command)
+
+                    if with_seed and not seed_pip(self.directory, python, version):
+                        # no pip wheel found to seed from, bootstrap with ensurepip
+                        run_subprocess(
+                            [self.executable, "-m", "ensurepip", "--default-pip"]
+                        )
+
+                    if use_cache:
+                        cache_venv(self.directory, cache_key)
+
+                self.version = version_string(version)
                 self.packages, self.locations = self.list()
 
             return self
@@ -160,9 +306,13 @@ class PythonVenv:
     def delete(self) -> None:
         path = get_venv_root(self.executable)
 
-        if not path.exists():
+        # a single stat call answers both the existence and the directory check
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
             raise PybmError(f"Location {path} does not exist.")
-        elif not path.is_dir():
+
+        if not stat.S_ISDIR(st.st_mode):
             raise PybmError(f"Location {path} is not a directory.")
         elif not is_valid_venv(path):
             raise PybmError(
@@ -170,7 +320,11 @@ class PythonVenv:
             )
 
         with action_context("remove", directory=path):
-            shutil.rmtree(path)
+            if os.name == "nt":
+                shutil.rmtree(path)
+            else:
+                # faster than rmtree for large trees, no per-file Python overhead
+                run_subprocess(["rm", "-rf", str(path)])
 
     def install(
         self,
@@ -183,7 +337,7 @@ class PythonVenv:
 
         requirements_file = locate_requirements_file(directory, True)
 
-        command = [self.executable, "-m", "pip", "install"]
+        command = ["install", *self.install_flags]
 
         has_requirements = requirements_file is not None
 
@@ -228,7 +382,7 @@ class PythonVenv:
         with pip_context(
             "install", self.executable, requirements_file=requirements_file
         ):
-            run_subprocess(command)
+            _run_pip(self.executable, command)
 
         return self
 
@@ -238,19 +392,9 @@ class PythonVenv:
 
         command = [self.executable, "-m", "pip", "list"]
 
-        rc, pip_output = run_subprocess(command)
-
-        # `pip list` output: table header, separator, package list
-        flat_pkg_table = pip_output.splitlines()[2:]
-        packages, locations = [], []
-
-        for line in flat_pkg_table:
-            # TODO: When using pybm.Packages here, change to --format=json to parse
-            #  directly
-            split_line = line.split()
-            packages.append("==".join(split_line[:2]))
-            if len(split_line) > 2:
-                locations.append(split_line[2])
+        # parse the package table line by line while pip is still writing it
+        with run_subprocess_stream(command) as stdout:
+            packages, locations = parse_pip_list(stdout)
 
         return packages, locations
 
@@ -263,18 +407,33 @@ class PythonVenv:
         options = options or []
 
         # do not ask for confirmation with -y switch
-        command = [self.executable, "-m", "pip", "uninstall", "-y", *packages, *options]
+        command = ["uninstall", "-y", *packages, *options]
 
         with pip_context("remove", self.directory, packages=packages):
-            run_subprocess(command)
+            _run_pip(self.executable, command)
+
+            # options like `-r <file>` remove unlisted packages, and editable
+            # installs have locations that cannot be matched to their packages
+            if options or self.locations:
+                self.update()
+                return self
+
+            # update the package list in memory instead of calling `pip list`
+            names = {project_name(pkg) for pkg in packages}
+            self._set_packages(
+                [p for p in self.packages if project_name(p) not in names],
+                list(self.locations),
+            )
 
         return self
 
-    def update(self):
-        packages, locations = self.list()
+    def _set_packages(self, packages: List[str], locations: List[str]) -> None:
         # preserve list object IDs
         self.packages.clear()
         self.packages.extend(packages)
         self.locations.clear()
         self.locations.extend(locations)
+
+    def update(self):
+        self._set_packages(*self.list())
         return self
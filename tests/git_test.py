@@ -0,0 +1,125 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from pybm.git import GitWorktree, GitWorktreeWrapper
+
+COMMIT = "0123456789abcdef0123456789abcdef01234567"
+OTHER_COMMIT = "fedcba9876543210fedcba9876543210fedcba98"
+
+
+def make_wrapper(worktrees: List[GitWorktree]) -> GitWorktreeWrapper:
+    # skip the constructor, which queries the installed git version
+    wrapper = GitWorktreeWrapper.__new__(GitWorktreeWrapper)
+    wrapper.iter_worktrees = lambda: iter(worktrees)
+    return wrapper
+
+
+@pytest.fixture
+def in_repo(tmp_path: Path, monkeypatch) -> Path:
+    """Run inside a repository directory, with worktrees next to it."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    monkeypatch.chdir(repo)
+    return tmp_path
+
+
+def test_from_block_branch():
+    lines = ["worktree /home/user/repo", f"HEAD {COMMIT}", "branch refs/heads/main"]
+    worktree = GitWorktree.from_block(lines, {})
+    assert worktree == GitWorktree("/home/user/repo", COMMIT, "main", None)
+
+
+def test_from_block_path_with_spaces():
+    lines = ["worktree /home/user/my repo", f"HEAD {COMMIT}", "branch refs/heads/dev"]
+    worktree = GitWorktree.from_block(lines, {})
+    assert worktree.root == "/home/user/my repo"
+    assert worktree.branch == "dev"
+
+
+def test_from_block_detached_with_tag():
+    lines = ["worktree /home/user/repo@v1", f"HEAD {COMMIT}", "detached"]
+    worktree = GitWorktree.from_block(lines, {COMMIT: "v1"})
+    assert worktree.branch is None
+    assert worktree.tag == "v1"
+    assert worktree.get_ref_and_type() == ("v1", "tag")
+
+
+def test_from_block_locked_and_prunable():
+    lines = [
+        "worktree /home/user/repo@old",
+        f"HEAD {COMMIT}",
+        "detached",
+        "locked",
+        "prunable gitdir file points to non-existent location",
+    ]
+    worktree = GitWorktree.from_block(lines, {})
+    assert worktree.locked and worktree.prunable
+    assert worktree.get_ref_and_type() == (COMMIT, "commit")
+
+
+def test_from_block_locked_with_reason():
+    lines = [
+        "worktree /home/user/repo",
+        f"HEAD {COMMIT}",
+        "branch refs/heads/main",
+        "locked on a removable drive",
+    ]
+    worktree = GitWorktree.from_block(lines, {})
+    assert worktree.locked and not worktree.prunable
+
+
+def test_find_worktree_root_over_branch(in_repo: Path):
+    (in_repo / "feature").mkdir()
+    wrapper = make_wrapper(
+        [
+            GitWorktree(str(in_repo / "repo"), COMMIT, "feature", None),
+            GitWorktree(str(in_repo / "feature"), OTHER_COMMIT, "dev", None),
+        ]
+    )
+    worktree, attr = wrapper.find_worktree("feature")
+    assert attr == "root"
+    assert worktree.root == str(in_repo / "feature")
+
+
+def test_find_worktree_root_needs_existing_path(in_repo: Path):
+    # a directory named like the branch exists elsewhere, but not here
+    wrapper = make_wrapper(
+        [
+            GitWorktree(str(in_repo / "repo"), COMMIT, "feature", None),
+            GitWorktree("/elsewhere/feature", OTHER_COMMIT, "dev", None),
+        ]
+    )
+    worktree, attr = wrapper.find_worktree("feature")
+    assert attr == "branch"
+    assert worktree.root == str(in_repo / "repo")
+
+
+def test_find_worktree_commit_over_branch_and_tag(in_repo: Path):
+    wrapper = make_wrapper(
+        [
+            GitWorktree(str(in_repo / "repo"), COMMIT, "fedcba98", None),
+            GitWorktree(str(in_repo / "other"), OTHER_COMMIT, None, "fedcba98"),
+        ]
+    )
+    worktree, attr = wrapper.find_worktree("fedcba98")
+    assert attr == "commit"
+    assert worktree.commit == OTHER_COMMIT
+
+
+def test_find_worktree_branch_over_tag(in_repo: Path):
+    wrapper = make_wrapper(
+        [
+            GitWorktree(str(in_repo / "repo"), COMMIT, None, "release"),
+            GitWorktree(str(in_repo / "other"), OTHER_COMMIT, "release", None),
+        ]
+    )
+    worktree, attr = wrapper.find_worktree("release")
+    assert attr == "branch"
+    assert worktree.commit == OTHER_COMMIT
+
+
+def test_find_worktree_no_match(in_repo: Path):
+    wrapper = make_wrapper([GitWorktree(str(in_repo / "repo"), COMMIT, "main", None)])
+    assert wrapper.find_worktree("unknown") == (None, None)
@@ -0,0 +1,103 @@
+from pybm.reporters.console import (
+    _FLOAT,
+    _NAME,
+    _OTHER,
+    _RELATIVE,
+    _SPEEDUP,
+    _get_column_plan,
+    format,
+)
+from pybm.reporters.util import groupby
+
+RESULTS = [
+    {"name": "a", "ref": "main", "time": 1.0},
+    {"name": "b", "ref": "main", "time": 2.0},
+    {"name": "a", "ref": "dev", "time": 3.0},
+    {"name": "b", "ref": "dev", "time": 4.0},
+    {"name": "a", "ref": "main", "time": 5.0},
+]
+
+
+def test_groupby_attribute():
+    groups = groupby("name", RESULTS)
+    assert groups == [
+        [RESULTS[0], RESULTS[2], RESULTS[4]],
+        [RESULTS[1], RESULTS[3]],
+    ]
+
+
+def test_groupby_attribute_list():
+    groups = groupby(["name", "ref"], RESULTS)
+    assert groups == [
+        [RESULTS[0], RESULTS[4]],
+        [RESULTS[1]],
+        [RESULTS[2]],
+        [RESULTS[3]],
+    ]
+
+
+def test_groupby_callable():
+    groups = groupby(lambda x: x["time"] > 2.5, RESULTS)
+    assert groups == [RESULTS[:2], RESULTS[2:]]
+
+
+def test_groupby_keeps_order_of_first_occurrence():
+    groups = groupby("ref", reversed(RESULTS))
+    assert [group[0]["ref"] for group in groups] == ["main", "dev"]
+    assert all(len(group) in (2, 3) for group in groups)
+
+
+def test_groupby_empty():
+    assert groupby("name", []) == []
+
+
+def make_aggregate(name: str, real_time: float):
+    return {
+        "name": name,
+        "benchmark_name": name,
+        "reference": "main",
+        "real_time": real_time,
+        "delta_real_time": 0.1,
+        "speedup": 1.1,
+        "iterations": 10,
+        "executable": "python",
+    }
+
+
+def test_column_plan():
+    plan = _get_column_plan(make_aggregate("f_mean", 1.0), "usec")
+    assert plan == (
+        ("benchmark_name", "Benchmark Name", _NAME),
+        ("reference", "Reference", _OTHER),
+        ("real_time", "Real Time (usec)", _FLOAT),
+        ("delta_real_time", "Δ Real Time", _RELATIVE),
+        ("speedup", "Speedup", _SPEEDUP),
+        ("iterations", "Iterations", _OTHER),
+    )
+
+
+def test_column_plan_is_reused():
+    plan = _get_column_plan(make_aggregate("f_mean", 1.0), "usec")
+    assert _get_column_plan(make_aggregate("g_mean", 2.0), "usec") is plan
+    assert _get_column_plan(make_aggregate("f_mean", 1.0), "msec") != plan
+
+
+def test_column_plan_depends_on_value_types():
+    bm = make_aggregate("f_mean", 1.0)
+    plan = _get_column_plan(bm, "usec")
+
+    # an integer timing is no float column, so it is not rescaled or rounded
+    bm["real_time"] = 1
+    assert ("real_time", "Real Time", _OTHER) in _get_column_plan(bm, "usec")
+    assert ("real_time", "Real Time (usec)", _FLOAT) in plan
+
+
+def test_format_uses_column_plan():
+    mean_agg = make_aggregate("f_mean", 1.0)
+    stddev_agg = dict(make_aggregate("f_stddev", 0.5), delta_real_time=0.0)
+
+    formatted = format([mean_agg, stddev_agg], "usec", digits=2)
+    assert list(formatted) == [key for _, key, _ in _get_column_plan(mean_agg, "usec")]
+    assert formatted["Benchmark Name"] == "f"
+    assert formatted["Reference"] == "main"
+    assert formatted["Iterations"] == "10"
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from pybm.util.venv import parse_pip_report, project_name, supports_pip_report
+
+
+def make_report(*items):
+    return json.dumps({"version": "1", "install": list(items)})
+
+
+def make_item(name, version, url="https://example.org/x.whl", editable=None):
+    download_info = {"url": url}
+    if editable is not None:
+        download_info["dir_info"] = {"editable": editable}
+    return {
+        "metadata": {"name": name, "version": version},
+        "download_info": download_info,
+    }
+
+
+def test_parse_pip_report():
+    report = make_report(make_item("numpy", "1.24.0"), make_item("six", "1.16.0"))
+    packages, locations = parse_pip_report(report)
+    assert packages == ["numpy==1.24.0", "six==1.16.0"]
+    assert locations == []
+
+
+def test_parse_pip_report_editable_location():
+    report = make_report(
+        make_item("mypkg", "0.1", url="file:///home/user/my%20pkg", editable=True),
+        make_item("otherpkg", "0.2", url="file:///home/user/other", editable=False),
+    )
+    packages, locations = parse_pip_report(report)
+    assert packages == ["mypkg==0.1", "otherpkg==0.2"]
+    assert locations == ["/home/user/my pkg"]
+
+
+def test_parse_pip_report_empty():
+    assert parse_pip_report(make_report()) == ([], [])
+
+
+def test_parse_pip_report_malformed():
+    # pip log lines in front of the report make it invalid JSON
+    with pytest.raises(ValueError):
+        parse_pip_report("Collecting numpy\n" + make_report())
+
+
+@pytest.mark.parametrize(
+    "requirement,name",
+    [
+        ("numpy", "numpy"),
+        ("Foo_Bar==1.0", "foo-bar"),
+        ("zope.interface>=5", "zope-interface"),
+        ("requests[socks]~=2.28", "requests"),
+        ("pkg @ https://example.org/pkg.whl", "pkg"),
+        ("typing-extensions; python_version < '3.8'", "typing-extensions"),
+        ("a__b..c--d!=2", "a-b-c-d"),
+    ],
+)
+def test_project_name(requirement, name):
+    assert project_name(requirement) == name
+
+
+@pytest.mark.parametrize(
+    "packages,expected",
+    [
+        (["pip==22.2"], True),
+        (["setuptools==65.0", "pip==23.2.1"], True),
+        (["pip==22.1.2"], False),
+        (["pip==9.0.1"], False),
+        (["Pip==22.3"], True),
+        (["pip==dev"], False),
+        (["setuptools==65.0"], False),
+        ([], False),
+    ],
+)
+def test_supports_pip_report(packages, expected):
+    assert supports_pip_report(packages) is expected